@@ -0,0 +1,61 @@
+from PySide6 import QtCore
+from app.logic.dedupe import content_hash
+
+
+class _ContentHashSignals(QtCore.QObject):
+    # task id, path that was added, {resolved path: hash} for the files that could be read
+    finished = QtCore.Signal(int, str, object)
+
+
+class _ContentHashTask(QtCore.QRunnable):
+    def __init__(self, task_id, path, resolved_paths, signals):
+        super().__init__()
+        # Owned by ContentHasher until it reports back: a Python runnable the pool deletes
+        # itself corrupts reference counts and aborts the interpreter at exit
+        self.setAutoDelete(False)
+        self.task_id = task_id
+        self.path = path
+        self.resolved_paths = resolved_paths
+        self.signals = signals
+
+    def run(self):
+        hashes = {}
+        for resolved in self.resolved_paths:
+            try:
+                hashes[resolved] = content_hash(resolved)
+            except OSError as e:
+                print(f"Could not hash {resolved} for duplicate detection: {e}")
+        self.signals.finished.emit(self.task_id, self.path, hashes)
+
+
+class ContentHasher(QtCore.QObject):
+    """Hashes files for duplicate detection on a background pool, so adding files never blocks the UI."""
+
+    hashes_ready = QtCore.Signal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Hashing is I/O bound; a couple of threads keep up without competing with thumbnails
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+
+        self._tasks = {} # task id -> queued or running task
+        self._next_task_id = 0
+        self._signals = _ContentHashSignals(self)
+        self._signals.finished.connect(self._handle_task_finished)
+
+    def request(self, path, resolved_paths):
+        """Hash resolved_paths in the background; hashes_ready(path, hashes) is emitted on the GUI thread."""
+        self._next_task_id += 1
+        task = _ContentHashTask(self._next_task_id, path, list(resolved_paths), self._signals)
+        self._tasks[task.task_id] = task
+        self._pool.start(task)
+
+    def shutdown(self):
+        self._pool.clear()
+        self._pool.waitForDone()
+        self._tasks.clear()
+
+    def _handle_task_finished(self, task_id, path, hashes):
+        self._tasks.pop(task_id, None)
+        self.hashes_ready.emit(path, hashes)
@@ -0,0 +1,139 @@
+import os
+from contextlib import contextmanager
+from app.logic.input_source import InputSource
+
+# Qt-free conversion routines shared by the desktop UI (FileConverter) and the
+# local conversion service. Progress is reported as an int percentage through
+# an optional `progress` callback.
+#
+# Conversion backends (Pillow, PyPDF2) are imported inside the functions so they
+# are only loaded on the first conversion, not at application startup.
+
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.webp', '.gif', '.tif', '.tiff']
+PDF_EXTENSIONS = ['.pdf']
+IMAGE_TYPES = ['png', 'jpeg', 'gif', 'bmp', 'tiff', 'webp'] # As detected by InputSource.sniff_type
+OUTPUT_FORMATS = ['png', 'jpg', 'jpeg', 'bmp', 'webp', 'gif', 'tiff', 'pdf']
+
+
+def _report(progress, value):
+    if progress:
+        progress(value)
+
+
+def is_supported_input(input_path):
+    input_ext = os.path.splitext(input_path)[1].lower()
+    return input_ext in IMAGE_EXTENSIONS or input_ext in PDF_EXTENSIONS
+
+
+def is_supported_output(output_format):
+    return isinstance(output_format, str) and output_format.lower() in OUTPUT_FORMATS
+
+
+@contextmanager
+def _open_input(input_path, source):
+    # Reuse the caller's opened input if there is one, otherwise open it here
+    if source is not None:
+        yield source.stream()
+    else:
+        with InputSource(input_path) as own_source:
+            yield own_source.stream()
+
+
+def convert_file(input_path, output_path, output_format, progress=None, source=None):
+    # The input is opened once; type detection and the decoder share the same file
+    if source is None:
+        with InputSource(input_path) as own_source:
+            return convert_file(input_path, output_path, output_format, progress, own_source)
+
+    # Prefer the detected type over the extension, fall back to the extension
+    detected_type = source.sniff_type()
+    input_ext = os.path.splitext(input_path)[1].lower()
+
+    # Handle image conversions
+    if detected_type in IMAGE_TYPES or (detected_type is None and input_ext in IMAGE_EXTENSIONS):
+        convert_image(input_path, output_path, output_format, progress, source)
+    # Handle PDF conversions
+    elif detected_type == 'pdf' or (detected_type is None and input_ext in PDF_EXTENSIONS):
+        convert_pdf(input_path, output_path, output_format, progress, source)
+    else:
+        raise ValueError(f"Unsupported input file type: {input_ext}")
+
+
+def convert_image(input_path, output_path, output_format, progress=None, source=None):
+    try:
+        from PIL import Image
+        from app.logic.frame_stream import MULTI_FRAME_FORMATS, convert_frame, tiff_compression
+
+        pil_format = 'JPEG' if output_format.lower() in ('jpg', 'jpeg') else output_format.upper()
+
+        # Open the image
+        with _open_input(input_path, source) as stream, Image.open(stream) as img:
+            if getattr(img, 'n_frames', 1) > 1 and pil_format in MULTI_FRAME_FORMATS:
+                _save_frames(img, output_path, pil_format, progress)
+            else:
+                # Single-frame target (or source): only the first frame is converted
+                frame = convert_frame(img, pil_format)
+
+                # Handle JPEG format specifically
+                if pil_format == 'JPEG':
+                    # Save JPEG with quality setting
+                    frame.save(output_path, format='JPEG', quality=95)
+                elif pil_format == 'TIFF':
+                    # Explicit, so the source's compression (e.g. group4) isn't reused for a converted frame
+                    frame.save(output_path, format='TIFF', compression=tiff_compression(frame.mode))
+                else:
+                    # Save other formats
+                    frame.save(output_path, format=pil_format)
+
+            _report(progress, 100)
+
+    except Exception as e:
+        raise Exception(f"Image conversion failed: {str(e)}")
+
+
+def _save_frames(img, output_path, pil_format, progress=None):
+    # Frames are streamed from the decoder to the encoder one at a time,
+    # so memory use doesn't grow with the number of frames/pages.
+    from app.logic.frame_stream import FrameStream, FrameDurations
+
+    def report_progress(frame_index, frame_count):
+        _report(progress, int(frame_index * 100 / frame_count))
+
+    stream = FrameStream(img, pil_format, on_frame=report_progress)
+    save_options = {'format': pil_format, 'save_all': True}
+    if pil_format in ('WEBP', 'GIF'):
+        # Keep the original per-frame timing and loop count for animations
+        save_options['duration'] = FrameDurations(stream)
+        if 'loop' in img.info:
+            save_options['loop'] = img.info['loop']
+        elif pil_format == 'WEBP':
+            save_options['loop'] = 1 # No loop count means play once; WebP would default to looping forever
+    if pil_format == 'WEBP':
+        save_options['quality'] = 95
+    stream.save(output_path, **save_options)
+
+
+def convert_pdf(input_path, output_path, output_format, progress=None, source=None):
+    try:
+        from PyPDF2 import PdfReader, PdfWriter
+
+        if output_format.lower() == 'pdf':
+            # PDF to PDF (optimize); pages are read lazily from the input,
+            # so it must stay open until the writer is done
+            with _open_input(input_path, source) as stream:
+                reader = PdfReader(stream)
+                writer = PdfWriter()
+
+                page_count = len(reader.pages)
+                for page_number, page in enumerate(reader.pages, start=1):
+                    writer.add_page(page)
+                    _report(progress, int(page_number * 90 / page_count))
+
+                with open(output_path, 'wb') as output_file:
+                    writer.write(output_file)
+            _report(progress, 100)
+        else:
+            raise ValueError(f"Unsupported PDF conversion to {output_format}")
+
+    except Exception as e:
+        raise Exception(f"PDF conversion failed: {str(e)}")
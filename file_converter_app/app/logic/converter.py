@@ -1,8 +1,7 @@
 import time
 import os
 from PySide6 import QtWidgets, QtCore, QtGui
-from PIL import Image
-from PyPDF2 import PdfReader, PdfWriter
+from app.logic import conversions
 
 class FileConverter:
     def __init__(self, main_window):
@@ -76,18 +75,7 @@ class FileConverter:
         self.main_window.setDisabled(True) # Disable UI during conversion
 
         try:
-            # Get file extension
-            input_ext = os.path.splitext(input_file_path)[1].lower()
-            
-            # Handle image conversions
-            if input_ext in ['.png', '.jpg', '.jpeg', '.bmp', '.webp']:
-                self.convert_image(input_file_path, output_file_path, output_format)
-            # Handle PDF conversions
-            elif input_ext == '.pdf':
-                self.convert_pdf(input_file_path, output_file_path, output_format)
-            else:
-                # self.status_log.append(f"Error: Unsupported input file type: {input_ext}") # REMOVED - Handled by exception below
-                raise ValueError(f"Unsupported input file type: {input_ext}")
+            conversions.convert_file(input_file_path, output_file_path, output_format, self.progress_bar.setValue)
 
             # self.status_log.append(f"Successfully converted {input_filename} to {output_filename}.") # REMOVED
             QtWidgets.QMessageBox.information(
@@ -108,45 +96,7 @@ class FileConverter:
             self.progress_bar.setValue(0) # Reset progress bar
 
     def convert_image(self, input_path, output_path, output_format):
-        try:
-            # Open the image
-            with Image.open(input_path) as img:
-                # Convert to RGB if necessary (for PNG with transparency)
-                if img.mode in ('RGBA', 'LA') and output_format.lower() in ('jpg', 'jpeg'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[-1])
-                    img = background
-                elif img.mode not in ('RGB', 'L'):
-                    img = img.convert('RGB')
-
-                # Handle JPEG format specifically
-                if output_format.lower() in ('jpg', 'jpeg'):
-                    # Save JPEG with quality setting
-                    img.save(output_path, format='JPEG', quality=95)
-                else:
-                    # Save other formats
-                    img.save(output_path, format=output_format.upper())
-                
-                self.progress_bar.setValue(100)
-
-        except Exception as e:
-            raise Exception(f"Image conversion failed: {str(e)}")
+        conversions.convert_image(input_path, output_path, output_format, self.progress_bar.setValue)
 
     def convert_pdf(self, input_path, output_path, output_format):
-        try:
-            if output_format.lower() == 'pdf':
-                # PDF to PDF (optimize)
-                reader = PdfReader(input_path)
-                writer = PdfWriter()
-
-                for page in reader.pages:
-                    writer.add_page(page)
-
-                with open(output_path, 'wb') as output_file:
-                    writer.write(output_file)
-                self.progress_bar.setValue(100)
-            else:
-                raise ValueError(f"Unsupported PDF conversion to {output_format}")
-
-        except Exception as e:
-            raise Exception(f"PDF conversion failed: {str(e)}")
+        conversions.convert_pdf(input_path, output_path, output_format, self.progress_bar.setValue)
@@ -0,0 +1,88 @@
+import os
+from app.logic.input_source import InputSource
+
+NEW = "new"
+SAME_PATH = "same_path" # The exact file is already queued
+
+
+def resolve_path(path):
+    """Canonical form of a path, so different spellings of the same file compare equal."""
+    return os.path.normcase(os.path.realpath(os.path.abspath(path)))
+
+
+def content_hash(path):
+    with InputSource(path) as source:
+        return source.content_hash()
+
+
+class DuplicateIndex:
+    """
+    Tracks queued files by resolved path and, optionally, by content.
+
+    Content hashes are only needed for files whose size matches another
+    queued file, so a batch of distinct files never gets read just to be
+    deduplicated. The index never hashes by itself: add() returns the paths
+    whose hashes are still missing, the caller hashes them (off the GUI
+    thread) and reports back with set_hashes(), then asks original_of().
+    """
+
+    def __init__(self, detect_content=True):
+        self.detect_content = detect_content
+        self._sizes = {} # resolved path -> size
+        self._by_size = {} # size -> [resolved paths], in the order they were added
+        self._hashes = {} # resolved path -> content hash, filled on demand
+
+    def add(self, path):
+        """
+        Register a path; returns (status, resolved path, resolved paths still to hash).
+
+        status is SAME_PATH if the file is already registered (nothing else is
+        done), otherwise NEW. When the list of paths to hash is non-empty the
+        file may still turn out to be a content copy of an earlier one.
+        """
+        resolved = resolve_path(path)
+        if resolved in self._sizes:
+            return SAME_PATH, resolved, []
+
+        size = os.path.getsize(resolved)
+        same_size = self._by_size.setdefault(size, [])
+        same_size.append(resolved)
+        self._sizes[resolved] = size
+        if not self.detect_content or len(same_size) == 1:
+            return NEW, resolved, []
+        return NEW, resolved, [other for other in same_size if other not in self._hashes]
+
+    def set_hashes(self, hashes):
+        """Record hashes computed for add(); entries for paths removed in the meantime are ignored."""
+        for resolved, digest in hashes.items():
+            if resolved in self._sizes:
+                self._hashes[resolved] = digest
+
+    def original_of(self, path):
+        """Resolved path of the earliest queued file with the same content as path, or None."""
+        resolved = resolve_path(path)
+        digest = self._hashes.get(resolved)
+        if digest is None:
+            return None
+        for other in self._by_size.get(self._sizes[resolved], []):
+            if other == resolved:
+                return None
+            if self._hashes.get(other) == digest:
+                return other
+        return None
+
+    def remove(self, path):
+        resolved = resolve_path(path)
+        size = self._sizes.pop(resolved, None)
+        if size is None:
+            return
+        self._hashes.pop(resolved, None)
+        same_size = self._by_size[size]
+        same_size.remove(resolved)
+        if not same_size:
+            del self._by_size[size]
+
+    def clear(self):
+        self._sizes.clear()
+        self._by_size.clear()
+        self._hashes.clear()
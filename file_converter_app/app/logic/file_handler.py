@@ -1,6 +1,12 @@
 import os
 import mimetypes
-from PySide6 import QtWidgets, QtCore
+from PySide6 import QtWidgets, QtCore, QtGui
+from app.logic.thumbnailer import THUMBNAIL_SIZE, ThumbnailLoader, file_signature
+from app.logic.content_hasher import ContentHasher
+from app.logic.dedupe import DuplicateIndex, SAME_PATH, resolve_path
+
+THUMBNAIL_REQUEST_DELAY_MS = 50 # Wait for scrolling to settle before requesting thumbnails
+SIGNATURE_ROLE = QtCore.Qt.ItemDataRole.UserRole + 3 # file_signature() of a row's file, None without thumbnail support
 
 class FileHandler:
     def __init__(self, main_window):
@@ -10,9 +16,48 @@ class FileHandler:
         self.file_list_widget = self.main_window.uploaded_files_list
         self.output_format_combo = self.main_window.output_format_combo
         # self.status_log = self.main_window.status_log # REMOVED
+        # Files already in the list, by resolved path and (for same-size files) by content
+        self.duplicate_index = DuplicateIndex(detect_content=True)
+        self._content_hasher = None # Hashes same-size files in the background, created on first use
+
+        # Thumbnails are rendered lazily, only for rows currently in view. The loader
+        # (and its thread pool) is created on first use so it costs nothing at startup.
+        self._thumbnail_loader = None
+        self.file_list_widget.setIconSize(QtCore.QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        # Every row always carries an icon of the same size (a transparent placeholder until its
+        # thumbnail arrives) and rows share one size hint, so setting or dropping thumbnails never
+        # changes row heights and never makes the view re-layout every row while scrolling.
+        self.file_list_widget.setUniformItemSizes(True)
+        placeholder_pixmap = QtGui.QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        placeholder_pixmap.fill(QtCore.Qt.GlobalColor.transparent)
+        self.placeholder_icon = QtGui.QIcon(placeholder_pixmap)
+        self.thumbnail_request_timer = QtCore.QTimer(self.file_list_widget)
+        self.thumbnail_request_timer.setSingleShot(True)
+        self.thumbnail_request_timer.setInterval(THUMBNAIL_REQUEST_DELAY_MS)
+        self.thumbnail_rows = set() # Rows currently showing a thumbnail icon
 
         # Connect signals
         self.file_list_widget.itemSelectionChanged.connect(self.handle_file_list_selection_change)
+        self.thumbnail_request_timer.timeout.connect(self.request_visible_thumbnails)
+        self.file_list_widget.verticalScrollBar().valueChanged.connect(self.schedule_thumbnail_request)
+        self.file_list_widget.model().rowsInserted.connect(self.schedule_thumbnail_request)
+
+    @property
+    def thumbnail_loader(self):
+        if self._thumbnail_loader is None:
+            self._thumbnail_loader = ThumbnailLoader(self.file_list_widget)
+            self._thumbnail_loader.thumbnail_ready.connect(self.apply_thumbnail)
+            # Drain the pool before the interpreter starts tearing down
+            QtWidgets.QApplication.instance().aboutToQuit.connect(self._thumbnail_loader.shutdown)
+        return self._thumbnail_loader
+
+    @property
+    def content_hasher(self):
+        if self._content_hasher is None:
+            self._content_hasher = ContentHasher(self.file_list_widget)
+            self._content_hasher.hashes_ready.connect(self.apply_content_hashes)
+            QtWidgets.QApplication.instance().aboutToQuit.connect(self._content_hasher.shutdown)
+        return self._content_hasher
 
     def _get_human_readable_size(self, size_in_bytes):
         if size_in_bytes < 1024:
@@ -46,7 +91,7 @@ class FileHandler:
             self.main_window,
             "Select Files to Convert",
             "",  # Start directory (empty means last used or default)
-            "All Files (*);;Images (*.png *.jpg *.jpeg *.bmp *.webp);;Documents (*.pdf *.docx *.txt)" 
+            "All Files (*);;Images (*.png *.jpg *.jpeg *.bmp *.webp *.gif *.tif *.tiff);;Documents (*.pdf *.docx *.txt)" 
         )
         if file_paths:
             # self.status_log.append(f"Selected {len(file_paths)} file(s) via dialog.") # REMOVED
@@ -62,27 +107,139 @@ class FileHandler:
                 print(f"Error: File not found - {file_path}") # Optional: print to console for debugging
                 continue
             
+            status, _, paths_to_hash = self.duplicate_index.add(file_path)
+            if status == SAME_PATH:
+                # The same file is already queued; don't add a row that would convert it twice
+                print(f"Skipping duplicate file - {file_path}") # Optional: print to console for debugging
+                continue
+
             file_name = os.path.basename(file_path)
             file_size_bytes = os.path.getsize(file_path)
             file_size_str = self._get_human_readable_size(file_size_bytes)
             file_type_str = self._get_simplified_file_type(file_path) # Simplified type
 
             self.add_file_to_list(file_name, file_size_str, file_type_str, file_path)
+            if paths_to_hash:
+                # Same size as a queued file: compare contents off the GUI thread, the row
+                # gets its duplicate mark (if any) in apply_content_hashes
+                self.content_hasher.request(file_path, paths_to_hash)
         
         self.update_output_formats_for_selection() # Update based on current selection (or lack thereof)
 
-    def add_file_to_list(self, file_name, file_size_str, file_type_str, original_path):
+    def add_file_to_list(self, file_name, file_size_str, file_type_str, original_path, duplicate_of=None):
         display_text = f"{file_name} ({file_type_str}, {file_size_str})"
         item = QtWidgets.QListWidgetItem(display_text)
         item.setData(QtCore.Qt.ItemDataRole.UserRole, original_path) # Store full path
         # Store the simplified file type string for easier access later
         item.setData(QtCore.Qt.ItemDataRole.UserRole + 1, file_type_str) 
+        self._set_duplicate_mark(item, duplicate_of)
+        # Taken once here (adding a file already reads its metadata) so scrolling never stats files
+        item.setData(SIGNATURE_ROLE, file_signature(original_path) if ThumbnailLoader.supports(original_path) else None)
+        item.setIcon(self.placeholder_icon)
         self.file_list_widget.addItem(item)
 
+    def _set_duplicate_mark(self, item, duplicate_of):
+        # Content copies of a file already in the list are kept but marked, so the user can
+        # see they would produce the same result. UserRole + 2 holds the original's resolved path.
+        base_text = item.text().split(' [duplicate of ')[0]
+        item.setData(QtCore.Qt.ItemDataRole.UserRole + 2, duplicate_of)
+        if duplicate_of:
+            item.setText(f"{base_text} [duplicate of {os.path.basename(duplicate_of)}]")
+            item.setToolTip(f"Same content as {duplicate_of}")
+        else:
+            item.setText(base_text)
+            item.setToolTip("")
+
+    def apply_content_hashes(self, file_path, hashes):
+        self.duplicate_index.set_hashes(hashes)
+        original = self.duplicate_index.original_of(file_path)
+        if original is None:
+            return
+        for row in range(self.file_list_widget.count()):
+            item = self.file_list_widget.item(row)
+            if item.data(QtCore.Qt.ItemDataRole.UserRole) == file_path:
+                self._set_duplicate_mark(item, original)
+
+    def _release_duplicates_of(self, removed_path):
+        # The first remaining copy becomes the new original; later copies now point at it
+        new_original = None
+        for row in range(self.file_list_widget.count()):
+            item = self.file_list_widget.item(row)
+            if item.data(QtCore.Qt.ItemDataRole.UserRole + 2) != removed_path:
+                continue
+            if new_original is None:
+                self._set_duplicate_mark(item, None)
+                new_original = resolve_path(item.data(QtCore.Qt.ItemDataRole.UserRole))
+            else:
+                self._set_duplicate_mark(item, new_original)
+
+    def schedule_thumbnail_request(self, *args):
+        # Restart the timer so a burst of scroll/insert signals results in a single request
+        self.thumbnail_request_timer.start()
+
+    def _index_near(self, x, y, step):
+        # The list has padding and item spacing, so probe a few pixels until we land on an item
+        for _ in range(32):
+            index = self.file_list_widget.indexAt(QtCore.QPoint(x, y))
+            if index.isValid():
+                return index
+            y += step
+        return index
+
+    def _visible_rows(self):
+        viewport_rect = self.file_list_widget.viewport().rect()
+        x = viewport_rect.center().x()
+        first_index = self._index_near(x, viewport_rect.top(), 1)
+        if not first_index.isValid():
+            return range(0)
+        last_index = self._index_near(x, viewport_rect.bottom(), -1)
+        last_row = last_index.row() if last_index.isValid() else self.file_list_widget.count() - 1
+        return range(first_index.row(), last_row + 1)
+
+    def request_visible_thumbnails(self):
+        visible_rows = self._visible_rows()
+
+        # Drop icons that scrolled out of view so a large list doesn't hold every pixmap;
+        # the loader's memory/disk caches make bringing them back cheap.
+        for row in self.thumbnail_rows.difference(visible_rows):
+            item = self.file_list_widget.item(row)
+            if item is not None:
+                item.setIcon(self.placeholder_icon)
+        self.thumbnail_rows.intersection_update(visible_rows)
+
+        # Only data already on the rows is used here: no file system access while scrolling
+        entries = []
+        for row in visible_rows:
+            item = self.file_list_widget.item(row)
+            if item is None or row in self.thumbnail_rows:
+                continue
+            signature = item.data(SIGNATURE_ROLE)
+            if signature is None:
+                continue
+            cached_image = self.thumbnail_loader.cached(signature)
+            if cached_image is not None:
+                item.setIcon(QtGui.QIcon(QtGui.QPixmap.fromImage(cached_image)))
+                self.thumbnail_rows.add(row)
+            else:
+                entries.append((item.data(QtCore.Qt.ItemDataRole.UserRole), signature))
+        self.thumbnail_loader.request(entries)
+
+    def apply_thumbnail(self, file_path, image, signature):
+        # Only rows still in view get an icon; others are picked up from the cache when scrolled back
+        icon = None
+        for row in self._visible_rows():
+            item = self.file_list_widget.item(row)
+            if item is not None and item.data(QtCore.Qt.ItemDataRole.UserRole) == file_path:
+                item.setData(SIGNATURE_ROLE, signature) # Picks up edits the render noticed
+                if icon is None:
+                    icon = QtGui.QIcon(QtGui.QPixmap.fromImage(image))
+                item.setIcon(icon)
+                self.thumbnail_rows.add(row)
+
     def get_output_formats(self, simplified_file_type):
         # This uses the simplified_file_type (e.g., "PNG Image", "PDF Document")
         if "Image" in simplified_file_type: # Covers PNG, JPG, BMP, WEBP etc.
-            return ["PNG", "JPG", "BMP", "WebP"]
+            return ["PNG", "JPG", "BMP", "WebP", "GIF", "TIFF", "PDF"]
         elif "PDF Document" == simplified_file_type:
             return ["PDF (Optimize)", "DOCX", "TXT"]
         # Add more specific conversions here
@@ -126,16 +283,24 @@ class FileHandler:
 
     def clear_all_files(self):
         self.file_list_widget.clear()
+        self.thumbnail_rows.clear()
+        self.duplicate_index.clear()
         # Reset output format combo and related UI elements as if no files are selected
         self.update_output_formats_for_selection() 
         # self.status_log.append("File list cleared. Ready for new files.") # REMOVED
 
     def remove_file_at_row(self, row_index):
         item = self.file_list_widget.takeItem(row_index)
+        # Rows below the removed one shift up by one
+        self.thumbnail_rows = {row if row < row_index else row - 1 for row in self.thumbnail_rows if row != row_index}
+        self.schedule_thumbnail_request()
         if item:
             # Attempt to get the original file path for a more robust name, fallback to item text
             original_path = item.data(QtCore.Qt.ItemDataRole.UserRole)
             file_name_to_log = os.path.basename(original_path) if original_path else item.text().split(' (')[0]
+            if original_path:
+                self.duplicate_index.remove(original_path)
+                self._release_duplicates_of(resolve_path(original_path))
             
             # self.status_log.append(f"Removed file: {file_name_to_log}") # REMOVED
             self.update_output_formats_for_selection() # Update combo box and selection state
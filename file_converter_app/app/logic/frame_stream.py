@@ -0,0 +1,107 @@
+from PIL import Image
+
+# Output formats Pillow can write as multi-frame files (WebP/GIF animations,
+# multi-page TIFF/PDF). Everything else only gets the first frame.
+MULTI_FRAME_FORMATS = ('WEBP', 'GIF', 'TIFF', 'PDF')
+
+# Source info keys that describe how the *input* was encoded. Pillow's encoders
+# fall back to im.info for some of them (TIFF reads 'compression'), so carrying
+# them over can apply e.g. group4 to a frame that is no longer bilevel.
+ENCODER_INFO_KEYS = ('compression', 'quality', 'jpegtables', 'progressive', 'progression', 'optimize')
+
+
+def tiff_compression(mode):
+    # Fax group 4 only works for bilevel images; deflate is lossless for everything else
+    return 'group4' if mode == '1' else 'tiff_deflate'
+
+
+def convert_frame(frame, output_format):
+    """Convert a single decoded frame to a mode the output format can store."""
+    has_alpha = frame.mode in ('RGBA', 'LA', 'PA') or (frame.mode == 'P' and 'transparency' in frame.info)
+
+    if output_format in ('JPEG', 'PDF', 'BMP'):
+        if has_alpha:
+            # Flatten transparency onto white, these formats have no alpha channel
+            rgba = frame.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.split()[-1])
+            return background
+        if frame.mode not in ('RGB', 'L'):
+            return frame.convert('RGB')
+        return frame
+
+    if has_alpha:
+        return frame if frame.mode == 'RGBA' else frame.convert('RGBA')
+    if output_format == 'TIFF' and frame.mode == '1':
+        return frame # Keep bilevel scans bilevel
+    if frame.mode not in ('RGB', 'L'):
+        return frame.convert('RGB')
+    return frame
+
+
+class FrameStream(Image.Image):
+    """
+    Presents a multi-frame source image to Pillow's save_all encoders one
+    converted frame at a time.
+
+    The encoders iterate their input with seek(), so each seek decodes the
+    next source frame and converts it in place; only the current frame is
+    ever held in memory, regardless of how many frames the source has.
+    """
+
+    def __init__(self, source, output_format, on_frame=None):
+        super().__init__()
+        self._source = source
+        self._output_format = output_format
+        self._on_frame = on_frame
+        self._next_frame = 0 # Encoders rewind to frame 0 when done; only report forward progress
+        self.n_frames = getattr(source, 'n_frames', 1)
+        self.is_animated = self.n_frames > 1
+        self._load_frame(0)
+
+    def _load_frame(self, frame_index):
+        self._source.seek(frame_index)
+        frame = convert_frame(self._source, self._output_format)
+        frame.load()
+        self.im = frame.im
+        self._mode = frame.mode
+        self._size = frame.size
+        self.palette = None
+        self.info = {key: value for key, value in self._source.info.items() if key not in ENCODER_INFO_KEYS}
+        if self._output_format == 'TIFF':
+            # The TIFF encoder reads compression per frame from info, so it can follow each frame's mode
+            self.info['compression'] = tiff_compression(self._mode)
+        if self._on_frame and frame_index >= self._next_frame:
+            self._next_frame = frame_index + 1
+            self._on_frame(frame_index, self.n_frames)
+
+    def seek(self, frame):
+        if frame == self.tell():
+            return
+        if not 0 <= frame < self.n_frames:
+            raise EOFError("attempt to seek outside sequence")
+        self._load_frame(frame)
+
+    def tell(self):
+        return self._source.tell()
+
+
+class FrameDurations(list):
+    """
+    Per-frame durations resolved lazily from the stream's current frame.
+
+    Animated encoders index the duration list right after encoding frame N,
+    while the stream is still positioned on it, so durations are preserved
+    without a separate pass over the source to collect them up front.
+    """
+
+    def __init__(self, stream, default=100):
+        super().__init__()
+        self._stream = stream
+        self._default = default
+
+    def __getitem__(self, index):
+        return self._stream.info.get('duration', self._default) or self._default
+
+    def __len__(self):
+        return self._stream.n_frames
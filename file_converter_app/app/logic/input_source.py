@@ -0,0 +1,111 @@
+import hashlib
+import mmap
+import os
+
+# How much of the file to ask the kernel to prefetch up front (headers for
+# type sniffing and the start of the decoder's reads); the rest follows
+# through sequential readahead.
+INITIAL_READAHEAD_BYTES = 8 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024 # Read size when hashing an unmapped input
+
+# (offset, magic bytes, type); checked in order
+_SIGNATURES = (
+    (0, b"\x89PNG\r\n\x1a\n", "png"),
+    (0, b"\xff\xd8\xff", "jpeg"),
+    (0, b"GIF87a", "gif"),
+    (0, b"GIF89a", "gif"),
+    (0, b"BM", "bmp"),
+    (0, b"II*\x00", "tiff"),
+    (0, b"MM\x00*", "tiff"),
+    (0, b"%PDF-", "pdf"),
+)
+
+
+class InputSource:
+    """
+    A conversion input opened once and shared by every consumer.
+
+    Type sniffing, hashing and the decoder all read through the same open
+    file, with readahead hints so the bytes come from the page cache once
+    instead of through a separate open and read per consumer.
+
+    With `mapped=True` the file is memory-mapped instead and decoders read the
+    mapping directly. Only use that for files nobody else can change (e.g.
+    uploads the service wrote itself): if a mapped file is truncated while
+    it is being read, the process is killed by SIGBUS instead of getting an
+    exception. Files owned by the user or another program use buffered reads,
+    where a truncated file just fails that conversion.
+
+        with InputSource(path) as source:
+            source.sniff_type()
+            Image.open(source.stream())
+    """
+
+    def __init__(self, path, mapped=False):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = None
+        try:
+            self.size = os.fstat(self._file.fileno()).st_size
+            if mapped and self.size > 0: # Empty files can't be mapped
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._advise_readahead()
+        except Exception:
+            self.close()
+            raise
+        self._content_hash = None
+
+    def _advise_readahead(self):
+        # Readahead hints matter most on slow (network/USB) mounts; they're
+        # advisory, so platforms without them just skip this.
+        fd = self._file.fileno()
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, min(self.size, INITIAL_READAHEAD_BYTES), os.POSIX_FADV_WILLNEED)
+        if self._mmap is not None and hasattr(self._mmap, "madvise"):
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+            if hasattr(mmap, "MADV_WILLNEED"):
+                self._mmap.madvise(mmap.MADV_WILLNEED, 0, min(self.size, INITIAL_READAHEAD_BYTES))
+
+    def stream(self):
+        """File-like object over the input, rewound to the start, for decoders."""
+        reader = self._mmap if self._mmap is not None else self._file
+        reader.seek(0)
+        return reader
+
+    def sniff_type(self):
+        """Detect the file type from its magic bytes; returns e.g. 'png', 'pdf' or None."""
+        header = self.stream().read(16)
+        for offset, magic, file_type in _SIGNATURES:
+            if header[offset:offset + len(magic)] == magic:
+                return file_type
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            return "webp"
+        return None
+
+    def content_hash(self):
+        """SHA-256 of the input contents, computed once (over the mapping itself when mapped)."""
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            if self._mmap is not None:
+                with memoryview(self._mmap) as view:
+                    digest.update(view)
+            else:
+                reader = self.stream()
+                for chunk in iter(lambda: reader.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
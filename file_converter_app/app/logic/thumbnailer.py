@@ -0,0 +1,253 @@
+import os
+import hashlib
+import time
+from collections import OrderedDict
+from PySide6 import QtCore, QtGui
+
+THUMBNAIL_SIZE = 48
+MEMORY_CACHE_LIMIT = 512 # Number of decoded thumbnails kept in memory
+DISK_CACHE_MAX_BYTES = 200 * 1024 * 1024
+DISK_CACHE_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp', '.gif', '.tif', '.tiff')
+PDF_EXTENSIONS = ('.pdf',)
+
+
+def _default_disk_cache_dir():
+    base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.StandardLocation.GenericCacheLocation)
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "file_converter_app", "thumbnails")
+
+
+def _scaled_size(source_size, max_side):
+    # Keep aspect ratio, never upscale
+    width, height = source_size.width(), source_size.height()
+    if width <= 0 or height <= 0:
+        return QtCore.QSize(max_side, max_side)
+    scale = min(max_side / width, max_side / height, 1.0)
+    return QtCore.QSize(max(1, int(width * scale)), max(1, int(height * scale)))
+
+
+def render_image_thumbnail(path, max_side):
+    reader = QtGui.QImageReader(path)
+    reader.setAutoTransform(True)
+    if reader.canRead():
+        # setScaledSize lets the decoder skip work (e.g. libjpeg DCT scaling)
+        # instead of decoding the full-resolution image first.
+        reader.setScaledSize(_scaled_size(reader.size(), max_side))
+        image = reader.read()
+        if not image.isNull():
+            return image
+
+    # Fall back to Pillow for formats without a Qt image plugin
+    try:
+        from PIL import Image
+        from PIL.ImageQt import ImageQt
+    except ImportError:
+        return None
+    with Image.open(path) as img:
+        img.draft('RGB', (max_side, max_side)) # Reduced-size decoding where supported
+        img.thumbnail((max_side, max_side))
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA')
+        return QtGui.QImage(ImageQt(img)).copy() # Detach from Pillow's buffer
+
+
+def render_pdf_thumbnail(path, max_side):
+    try:
+        from PySide6.QtPdf import QPdfDocument
+    except ImportError:
+        return None
+    document = QPdfDocument()
+    try:
+        if document.load(path) != QPdfDocument.Error.None_ or document.pageCount() < 1:
+            return None
+        page_size = document.pagePointSize(0).toSize()
+        image = document.render(0, _scaled_size(page_size, max_side))
+        return None if image.isNull() else image
+    finally:
+        document.close()
+
+
+def file_signature(path):
+    """(path, mtime, size) key shared by the memory and disk caches; None if the file is gone."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def prune_disk_cache(cache_dir, max_bytes=DISK_CACHE_MAX_BYTES, max_age_seconds=DISK_CACHE_MAX_AGE_SECONDS):
+    """Delete thumbnails older than max_age_seconds, then the least recently used ones above max_bytes."""
+    entries = []
+    cutoff = time.time() - max_age_seconds
+    for root, _, file_names in os.walk(cache_dir):
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime < cutoff:
+                    os.remove(path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue # Removed concurrently, or not ours to touch
+
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries): # Oldest (least recently used) first
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total_bytes -= size
+        except OSError:
+            continue
+
+
+class _ThumbnailSignals(QtCore.QObject):
+    # path, image (a null QImage if the file could not be rendered), signature it was rendered from
+    finished = QtCore.Signal(str, QtGui.QImage, object)
+
+
+class _ThumbnailTask(QtCore.QRunnable):
+    def __init__(self, path, signature, max_side, disk_cache_dir, signals):
+        super().__init__()
+        self.setAutoDelete(False) # Owned by ThumbnailLoader so it can be taken back from the queue
+        self.path = path
+        self.signature = signature
+        self.max_side = max_side
+        self.disk_cache_dir = disk_cache_dir
+        self.signals = signals
+
+    def _disk_cache_path(self):
+        abs_path, mtime_ns, size = self.signature
+        key = f"{abs_path}|{mtime_ns}|{size}|{self.max_side}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_cache_dir, digest[:2], f"{digest}.png")
+
+    def run(self):
+        image = None
+        try:
+            # The caller's signature was taken when the file was listed; stat again here, off
+            # the GUI thread, so an edited file is rendered (and cached) under its new signature
+            self.signature = file_signature(self.path) or self.signature
+            cache_path = self._disk_cache_path()
+            if os.path.exists(cache_path):
+                cached = QtGui.QImage(cache_path)
+                if not cached.isNull():
+                    image = cached
+                    os.utime(cache_path) # Mark as recently used for pruning
+
+            if image is None:
+                ext = os.path.splitext(self.path)[1].lower()
+                if ext in PDF_EXTENSIONS:
+                    image = render_pdf_thumbnail(self.path, self.max_side)
+                elif ext in IMAGE_EXTENSIONS:
+                    image = render_image_thumbnail(self.path, self.max_side)
+
+                if image is not None:
+                    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                    if image.save(tmp_path, "PNG"):
+                        os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Thumbnail generation failed for {self.path}: {e}")
+            image = None
+
+        self.signals.finished.emit(self.path, image if image is not None else QtGui.QImage(), self.signature)
+
+
+class _PruneDiskCacheTask(QtCore.QRunnable):
+    def __init__(self, cache_dir):
+        super().__init__()
+        self.cache_dir = cache_dir
+
+    def run(self):
+        try:
+            prune_disk_cache(self.cache_dir)
+        except Exception as e:
+            print(f"Thumbnail cache pruning failed: {e}")
+
+
+class ThumbnailLoader(QtCore.QObject):
+    """Renders file thumbnails on a background pool with memory (LRU) and disk caching."""
+
+    # path, image, signature of the file the image was rendered from
+    thumbnail_ready = QtCore.Signal(str, QtGui.QImage, object)
+
+    def __init__(self, parent=None, max_side=THUMBNAIL_SIZE, memory_limit=MEMORY_CACHE_LIMIT, disk_cache_dir=None):
+        super().__init__(parent)
+        self.max_side = max_side
+        self.memory_limit = memory_limit
+        self.disk_cache_dir = disk_cache_dir or _default_disk_cache_dir()
+
+        # Both caches are keyed by file_signature(), so an edited file gets a new thumbnail
+        # and one that failed (e.g. while still being written) is retried once it changes.
+        # Callers pass signatures they already hold, so lookups never touch the disk.
+        self._memory_cache = OrderedDict() # signature -> QImage, most recently used last
+        self._failed = set() # Signatures that could not be rendered, don't retry them
+        self._in_flight = {} # path -> (queued or running task, signature)
+
+        # A dedicated pool so pending (not yet started) requests can be dropped
+        # when the visible rows change, without touching the global pool.
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(4, QtCore.QThread.idealThreadCount() - 1)))
+
+        self._signals = _ThumbnailSignals(self)
+        self._signals.finished.connect(self._handle_task_finished)
+
+        # Keep the disk cache bounded; runs in the background like the renders
+        self._pool.start(_PruneDiskCacheTask(self.disk_cache_dir))
+
+    @staticmethod
+    def supports(path):
+        return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS + PDF_EXTENSIONS
+
+    def cached(self, signature):
+        """Memory-cached thumbnail for a file_signature() (None for files without thumbnails)."""
+        if signature is None:
+            return None
+        image = self._memory_cache.get(signature)
+        if image is not None:
+            self._memory_cache.move_to_end(signature)
+        return image
+
+    def request(self, entries):
+        """
+        Queue thumbnails for (path, signature) pairs; queued requests for other paths that
+        have not started are dropped. Pairs without a signature (no thumbnail support) are skipped.
+        """
+        wanted = {path for path, _ in entries}
+        for path, (task, _) in list(self._in_flight.items()):
+            # tryTake only succeeds for tasks that are still waiting in the queue
+            if path not in wanted and self._pool.tryTake(task):
+                del self._in_flight[path]
+        for path, signature in entries:
+            if path in self._in_flight or signature is None:
+                continue
+            if signature in self._memory_cache or signature in self._failed:
+                continue
+            task = _ThumbnailTask(path, signature, self.max_side, self.disk_cache_dir, self._signals)
+            self._in_flight[path] = (task, signature)
+            self._pool.start(task)
+
+    def shutdown(self):
+        self._pool.clear()
+        self._pool.waitForDone()
+        self._in_flight.clear()
+
+    def _handle_task_finished(self, path, image, signature):
+        _, requested_signature = self._in_flight.pop(path, (None, None))
+        if requested_signature is None:
+            return
+        if image.isNull():
+            # Also remember the signature the caller holds, so its row doesn't keep asking
+            self._failed.update((requested_signature, signature))
+            return
+        self._memory_cache[signature] = image
+        self._memory_cache.move_to_end(signature)
+        while len(self._memory_cache) > self.memory_limit:
+            self._memory_cache.popitem(last=False)
+        self.thumbnail_ready.emit(path, image, signature)
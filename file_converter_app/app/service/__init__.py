@@ -0,0 +1,5 @@
+# This file makes 'service' a Python package.
+
+"""
+Local conversion service (HTTP job API) for the File Converter Application
+"""
@@ -0,0 +1,55 @@
+import argparse
+import os
+import secrets
+import sys
+
+from app.service.jobs import JobManager
+from app.service.server import ConversionHTTPServer, UnixConversionHTTPServer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.service", description="Local file conversion service")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on (default: 8765)")
+    parser.add_argument("--unix-socket", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="Number of conversion worker threads")
+    parser.add_argument("--max-pending", type=int, default=16, help="Jobs allowed to wait for a worker before new ones get 503")
+    parser.add_argument("--dedupe-content", action="store_true",
+                        help="Also treat copies of a file at different paths as identical jobs (hashes each input)")
+    parser.add_argument("--output-dir", action="append", default=[],
+                        help="Directory jobs may write 'output_path' results into (repeatable); without one, "
+                             "results are only available through /jobs/<id>/result")
+    parser.add_argument("--token-file",
+                        help="Write the TCP auth token to this file (mode 0600). The token is taken from "
+                             "FILE_CONVERTER_SERVICE_TOKEN or generated at startup")
+    parser.add_argument("--work-dir", help="Directory for uploads and results (default: a new temp directory)")
+    options = parser.parse_args(argv)
+
+    job_manager = JobManager(workers=options.workers, max_pending=options.max_pending,
+                             work_dir=options.work_dir, dedupe_content=options.dedupe_content,
+                             output_dirs=options.output_dir)
+    if options.unix_socket:
+        server = UnixConversionHTTPServer(options.unix_socket, job_manager)
+        print(f"Conversion service listening on unix:{options.unix_socket} ({job_manager.workers} workers)")
+    else:
+        token = os.environ.get("FILE_CONVERTER_SERVICE_TOKEN") or secrets.token_urlsafe(32)
+        if options.token_file:
+            descriptor = os.open(options.token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, "w") as token_file:
+                token_file.write(token)
+        server = ConversionHTTPServer((options.host, options.port), job_manager, token)
+        print(f"Conversion service listening on http://{options.host}:{options.port} ({job_manager.workers} workers)")
+        if not options.token_file and "FILE_CONVERTER_SERVICE_TOKEN" not in os.environ:
+            print(f"Auth token: {token}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        job_manager.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+from app.logic import conversions
+from app.logic.dedupe import resolve_path
+from app.logic.input_source import InputSource
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no free slot; callers should retry later."""
+
+
+class Job:
+    def __init__(self, input_path, output_path, output_format, owns_input=False):
+        self.id = uuid.uuid4().hex
+        self.input_path = input_path
+        self.output_path = output_path
+        self.output_format = output_format
+        self.owns_input = owns_input # Uploaded inputs live in the work dir and are deleted with the job
+        self.status = QUEUED
+        self.progress = 0
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.flight_key = None
+        self.source = None # Input already opened (and hashed) at submission, reused by the worker
+        # One claim token per submission sharing this job; its files go when the last claim is dropped
+        self.claims = set()
+
+        # Bumped on every change so watchers can wait for "something newer than version N"
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "output_format": self.output_format,
+            "error": self.error,
+            "requesters": len(self.claims),
+        }
+
+    def update(self, **changes):
+        with self._changed:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, version, timeout=None):
+        """Block until the job's version differs from `version` (or timeout); returns the current version."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class JobManager:
+    """
+    Runs conversion jobs on a fixed pool of worker threads.
+
+    At most `workers + max_pending` jobs can be admitted (queued or running) at
+    once. Callers reserve a slot before doing any expensive work such as reading
+    an upload, so a full queue pushes back immediately instead of buffering.
+
+    Identical jobs (same input, target and output path) are single-flighted:
+    while one is queued, running or done, further submissions join it rather
+    than converting again. Inputs are identified by resolved path, size and
+    mtime, or by content hash when one is given (uploads) or `dedupe_content`
+    is set, so copies of the same file also share a job.
+    """
+
+    def __init__(self, workers=None, max_pending=16, work_dir=None, result_ttl=3600, dedupe_content=False,
+                 output_dirs=()):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.result_ttl = result_ttl
+        self.dedupe_content = dedupe_content
+        # Callers may only name an output_path inside one of these; with none, results stay in the work dir
+        self.output_dirs = [resolve_path(directory) for directory in output_dirs]
+        self._owns_work_dir = work_dir is None # Only a temp dir we created is removed on shutdown
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="file_converter_service_")
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        self._jobs = {}
+        self._flights = {} # flight key -> job that produces (or produced) that result
+        self._jobs_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + max_pending)
+        self._queue = queue.Queue(maxsize=self.workers + max_pending)
+        self._threads = []
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"conversion-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def reserve_slot(self):
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Conversion queue is full")
+
+    def release_slot(self):
+        self._slots.release()
+
+    def new_upload_path(self, filename):
+        # Keep the original extension, the converters dispatch on it
+        extension = os.path.splitext(filename or "")[1].lower()
+        return os.path.join(self.work_dir, f"upload_{uuid.uuid4().hex}{extension}")
+
+    def validate(self, input_path, output_format, output_path=None):
+        """Raise ValueError unless the request is well-formed; cheap, so call it before reserving a slot."""
+        if not isinstance(input_path, str) or not conversions.is_supported_input(input_path):
+            raise ValueError("Unsupported input file type")
+        if not conversions.is_supported_output(output_format):
+            raise ValueError(f"Unsupported target format, expected one of: {', '.join(conversions.OUTPUT_FORMATS)}")
+        if output_path is not None:
+            if not isinstance(output_path, str):
+                raise ValueError("'output_path' must be a string")
+            output_dir = os.path.dirname(resolve_path(output_path))
+            if not any(output_dir == allowed or output_dir.startswith(allowed + os.sep) for allowed in self.output_dirs):
+                raise ValueError("'output_path' is not inside an allowed output directory")
+
+    def submit(self, input_path, output_format, output_path=None, owns_input=False, input_hash=None):
+        """
+        Queue a conversion; the caller must already hold a slot from reserve_slot().
+
+        Returns (job, claim): the claim token is this submission's handle for
+        delete(). If an identical job is already queued, running or done, that
+        job is returned with a new claim instead, the slot is released and an
+        owned input is deleted. If submit raises, the slot is still the
+        caller's to release.
+        """
+        self.validate(input_path, output_format, output_path)
+
+        self._expire_finished_jobs()
+        extension = 'jpg' if output_format.lower() == 'jpeg' else output_format.lower()
+
+        source = None
+        if input_hash is None and self.dedupe_content:
+            # Hash through the same open input the worker will decode from, so it
+            # is opened once and its second read comes from the page cache
+            source = InputSource(input_path)
+        try:
+            if source is not None:
+                input_hash = source.content_hash()
+            flight_key = self._flight_key(input_path, extension, output_path, input_hash)
+        except Exception:
+            if source is not None:
+                source.close()
+            raise
+
+        claim = uuid.uuid4().hex
+        with self._jobs_lock:
+            existing = self._flights.get(flight_key)
+            if existing is not None and self._can_share(existing):
+                existing.claims.add(claim)
+                existing.update()
+            else:
+                existing = None
+                job = Job(input_path, None, output_format, owns_input)
+                job.output_path = output_path or os.path.join(self.work_dir, f"result_{job.id}.{extension}")
+                job.flight_key = flight_key
+                job.source = source
+                job.claims.add(claim)
+                self._jobs[job.id] = job
+                self._flights[flight_key] = job
+
+        if existing is not None:
+            if source is not None:
+                source.close()
+            self.release_slot()
+            if owns_input and os.path.exists(input_path):
+                os.remove(input_path)
+            return existing, claim
+
+        self._queue.put_nowait(job) # Never blocks: admission is bounded by the slots
+        return job, claim
+
+    def _flight_key(self, input_path, extension, output_path, input_hash):
+        output_key = resolve_path(output_path) if output_path else None
+        if input_hash is not None:
+            return ("content", input_hash, extension, output_key)
+        # Size and mtime are part of the key so an edited file is converted again
+        stat = os.stat(input_path)
+        return ("path", resolve_path(input_path), stat.st_size, stat.st_mtime_ns, extension, output_key)
+
+    @staticmethod
+    def _can_share(job):
+        # Failed jobs are retried; finished ones only while their result still exists
+        if job.status == FAILED:
+            return False
+        return job.status != DONE or os.path.exists(job.output_path)
+
+    def get(self, job_id):
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def delete(self, job_id, claim):
+        """
+        Drop one submission's claim on a finished job; returns False if the job is still running.
+
+        The job and its files are only removed once every submission that
+        shares it has dropped its claim. Raises ValueError for an unknown claim.
+        """
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in FINISHED_STATES:
+                return False
+            if claim not in job.claims:
+                raise ValueError("Unknown or already released claim for this job")
+            job.claims.discard(claim)
+            job.update()
+            if job.claims:
+                return True # Other requesters still need the result
+            self._forget(job)
+        self._remove_job_files(job)
+        return True
+
+    def _forget(self, job):
+        # Callers hold _jobs_lock
+        del self._jobs[job.id]
+        if self._flights.get(job.flight_key) is job:
+            del self._flights[job.flight_key]
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._owns_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                self._run(job)
+            finally:
+                self.release_slot()
+
+    def _run(self, job):
+        job.update(status=RUNNING)
+        last_progress = [0]
+
+        def report_progress(value):
+            # Only wake watchers when the percentage actually moves
+            if value != last_progress[0]:
+                last_progress[0] = value
+                job.update(progress=value)
+
+        try:
+            # Only uploads in the work dir are memory-mapped; a caller's file could be
+            # truncated mid-conversion, which on a mapping kills the process (SIGBUS)
+            source, job.source = job.source, None
+            if source is None:
+                source = InputSource(job.input_path, mapped=job.owns_input)
+            with source:
+                conversions.convert_file(job.input_path, job.output_path, job.output_format, report_progress, source)
+            job.update(status=DONE, progress=100, finished_at=time.time())
+        except Exception as e:
+            with self._jobs_lock:
+                # Let the next identical submission retry instead of joining a failure
+                if self._flights.get(job.flight_key) is job:
+                    del self._flights[job.flight_key]
+            job.update(status=FAILED, error=str(e), finished_at=time.time())
+        finally:
+            if job.owns_input and os.path.exists(job.input_path):
+                os.remove(job.input_path)
+
+    def _expire_finished_jobs(self):
+        if not self.result_ttl:
+            return
+        cutoff = time.time() - self.result_ttl
+        with self._jobs_lock:
+            expired = [job for job in self._jobs.values() if job.finished_at and job.finished_at < cutoff]
+            for job in expired:
+                self._forget(job)
+        for job in expired:
+            self._remove_job_files(job)
+
+    def _remove_job_files(self, job):
+        # Only files inside the work dir belong to the service; never delete a caller's output_path
+        for path in (job.input_path if job.owns_input else None, job.output_path):
+            if path and os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.work_dir) and os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,326 @@
+import hashlib
+import hmac
+import json
+import os
+import shutil
+import socketserver
+import stat
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from app.service.jobs import DONE, FINISHED_STATES, QueueFullError
+
+CHUNK_SIZE = 1024 * 1024 # Request/response bodies are streamed in chunks of this size
+EVENT_KEEPALIVE_SECONDS = 15
+RETRY_AFTER_SECONDS = 5
+MAX_JSON_BODY_BYTES = 64 * 1024
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON job API for the conversion service:
+
+        POST   /jobs                 {"path": ..., "target": ..., "output_path": optional}
+        POST   /jobs/upload?target=webp&filename=in.gif   (raw file body)
+        GET    /jobs/<id>            job status
+        GET    /jobs/<id>/events     newline-delimited JSON status updates until the job finishes
+        GET    /jobs/<id>/result     converted file
+        DELETE /jobs/<id>?claim=...  release a finished job; its files go with the last claim
+
+    Identical submissions return the job that is already producing the same
+    result (see JobManager). Every submission response carries its own
+    "claim" token, so one client can't delete a result others still need.
+
+    Over TCP every request needs "Authorization: Bearer <token>", and JSON
+    requests need "Content-Type: application/json"; a web page can send
+    neither cross-origin without a CORS preflight, which is never granted.
+    The Unix socket relies on its file permissions instead.
+    """
+
+    protocol_version = "HTTP/1.1" # Needed for chunked transfer encoding
+    server_version = "FileConverterService/0.1"
+
+    @property
+    def manager(self):
+        return self.server.job_manager
+
+    def _authorized(self):
+        token = getattr(self.server, "auth_token", None)
+        if token is None:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            return True
+        self.close_connection = True # Any request body is left unread
+        self._send_error(401, "Missing or invalid token", headers={"WWW-Authenticate": "Bearer"})
+        return False
+
+    # --- Routing ---
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        if url.path == "/jobs":
+            self._submit_path_job()
+        elif url.path == "/jobs/upload":
+            self._submit_upload_job(parse_qs(url.query))
+        else:
+            self._send_error(404, "Not found")
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        job, action = self._route_job()
+        if job is None:
+            return
+        if action is None:
+            self._send_json(200, job.to_dict())
+        elif action == "events":
+            self._stream_events(job)
+        elif action == "result":
+            self._send_result(job)
+        else:
+            self._send_error(404, "Not found")
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        job, action = self._route_job()
+        if job is None:
+            return
+        if action is not None:
+            self._send_error(404, "Not found")
+            return
+        claim = parse_qs(urlparse(self.path).query).get("claim", [""])[0]
+        try:
+            deleted = self.manager.delete(job.id, claim)
+        except ValueError as e:
+            self._send_error(403, str(e))
+            return
+        if deleted:
+            self._send_json(200, {"id": job.id, "deleted": True})
+        else:
+            self._send_error(409, "Job is still running")
+
+    def _route_job(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        if len(parts) not in (2, 3) or parts[0] != "jobs":
+            self._send_error(404, "Not found")
+            return None, None
+        job = self.manager.get(parts[1])
+        if job is None:
+            self._send_error(404, "Unknown job")
+            return None, None
+        return job, parts[2] if len(parts) == 3 else None
+
+    # --- Job submission ---
+
+    def _submit_path_job(self):
+        if self.headers.get_content_type() != "application/json":
+            self.close_connection = True
+            self._send_error(415, "Expected Content-Type: application/json")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_JSON_BODY_BYTES:
+            self.close_connection = True
+            self._send_error(413, f"JSON body must be at most {MAX_JSON_BODY_BYTES} bytes")
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}") # Small JSON document, not a file
+            input_path = payload["path"]
+            output_format = payload["target"]
+            output_path = payload.get("output_path")
+            self.manager.validate(input_path, output_format, output_path)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._send_error(400, f"Expected a JSON object with string 'path' and 'target': {e}")
+            return
+        if not os.path.isfile(input_path):
+            self._send_error(400, f"Input file not found: {input_path}")
+            return
+
+        try:
+            self.manager.reserve_slot()
+        except QueueFullError as e:
+            self._send_busy(str(e))
+            return
+        try:
+            job, claim = self.manager.submit(input_path, output_format, output_path=output_path)
+        except Exception as e:
+            # Whatever failed, submit didn't take the slot; release it before answering
+            self.manager.release_slot()
+            self._send_error(400, str(e))
+            return
+        self._send_json(202, dict(job.to_dict(), claim=claim), {"Location": f"/jobs/{job.id}"})
+
+    def _submit_upload_job(self, query):
+        output_format = query.get("target", [""])[0]
+        filename = query.get("filename", [""])[0]
+        # Validate before touching the body, like the slot reservation below
+        try:
+            self.manager.validate(filename, output_format)
+        except ValueError as e:
+            self.close_connection = True # The unread body makes the connection unusable
+            self._send_error(400, f"Expected supported 'target' and 'filename' query parameters: {e}")
+            return
+
+        # Reserve a slot before reading the body: when the queue is full the
+        # client is turned away without the upload ever touching the disk.
+        try:
+            self.manager.reserve_slot()
+        except QueueFullError as e:
+            self.close_connection = True # The unread body makes the connection unusable
+            self._send_busy(str(e))
+            return
+
+        upload_path = self.manager.new_upload_path(filename)
+        try:
+            # Hash while streaming to disk, so re-uploads of the same file can join an
+            # existing job without reading the upload a second time
+            upload_hash = hashlib.sha256()
+            with open(upload_path, "wb") as upload_file:
+                self._copy_request_body(upload_file, upload_hash)
+            job, claim = self.manager.submit(upload_path, output_format, owns_input=True,
+                                             input_hash=upload_hash.hexdigest())
+        except Exception as e:
+            # Whatever failed, submit didn't take the slot; release it before answering
+            if os.path.exists(upload_path):
+                os.remove(upload_path)
+            self.manager.release_slot()
+            self.close_connection = True
+            self._send_error(400, f"Upload failed: {e}")
+            return
+        self._send_json(202, dict(job.to_dict(), claim=claim), {"Location": f"/jobs/{job.id}"})
+
+    def _copy_request_body(self, destination, digest):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                chunk_length = int(self.rfile.readline().split(b";", 1)[0].strip(), 16)
+                if chunk_length == 0:
+                    # Skip optional trailers up to the terminating blank line
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                self._copy_exact(chunk_length, destination, digest)
+                self.rfile.readline() # CRLF after each chunk
+        else:
+            if "Content-Length" not in self.headers:
+                raise ValueError("Content-Length or chunked Transfer-Encoding is required")
+            self._copy_exact(int(self.headers["Content-Length"]), destination, digest)
+
+    def _copy_exact(self, length, destination, digest):
+        remaining = length
+        while remaining > 0:
+            data = self.rfile.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                raise ValueError("Request body ended early")
+            destination.write(data)
+            digest.update(data)
+            remaining -= len(data)
+
+    # --- Responses ---
+
+    def _stream_events(self, job):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        version = None
+        try:
+            while True:
+                # Re-read the version before the snapshot so no update is missed between waits
+                version = job.version
+                self._write_chunk(json.dumps(job.to_dict()).encode("utf-8") + b"\n")
+                if job.status in FINISHED_STATES:
+                    break
+                if job.wait_for_change(version, timeout=EVENT_KEEPALIVE_SECONDS) == version:
+                    self._write_chunk(b"\n") # Keep idle connections (and proxies) alive
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_result(self, job):
+        if job.status != DONE:
+            self._send_error(409, f"Job is {job.status}", job.to_dict())
+            return
+        try:
+            result_file = open(job.output_path, "rb")
+        except OSError:
+            self._send_error(410, "Result is no longer available")
+            return
+        with result_file:
+            size = os.fstat(result_file.fileno())[stat.ST_SIZE]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(size))
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(job.output_path)}"')
+            self.end_headers()
+            shutil.copyfileobj(result_file, self.wfile, CHUNK_SIZE)
+
+    def _send_busy(self, message):
+        self._send_error(503, message, headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+    def _send_error(self, status, message, extra=None, headers=None):
+        body = {"error": message}
+        if extra:
+            body.update(extra)
+        self._send_json(status, body, headers)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix-socket"
+
+
+class ConversionHTTPServer(ThreadingHTTPServer):
+    def __init__(self, address, job_manager, auth_token):
+        if not auth_token:
+            raise ValueError("The TCP service requires an auth token")
+        self.job_manager = job_manager
+        self.auth_token = auth_token
+        super().__init__(address, ConversionRequestHandler)
+
+
+class UnixConversionHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, job_manager):
+        self.job_manager = job_manager
+        self.auth_token = None # Access is limited by the socket's file permissions
+        try:
+            existing = os.lstat(socket_path)
+        except FileNotFoundError:
+            existing = None
+        if existing is not None:
+            if not stat.S_ISSOCK(existing.st_mode):
+                raise FileExistsError(f"{socket_path} exists and is not a socket")
+            os.remove(socket_path) # Stale socket from a previous run
+        super().__init__(socket_path, ConversionRequestHandler)
+        os.chmod(socket_path, 0o600) # Local tools running as the same user only
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
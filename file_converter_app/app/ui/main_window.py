@@ -158,7 +158,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def __init__(self):
         super().__init__()
-        self.setStyleSheet(self.DARK_STYLE)
+        self.apply_theme() # Apply dark theme by default, before children are created
 
         self.setWindowTitle("Converter")
         self.resize(500, 270)
@@ -281,7 +281,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.clear_files_button.clicked.connect(self.show_upload_view)
         self.uploaded_files_list.customContextMenuRequested.connect(self.show_file_list_context_menu)
 
-        self.apply_theme() # Apply dark theme by default
+        # The stylesheet is applied once, at the top of __init__; re-applying it
+        # here would repolish every child widget a second time on startup.
 
     # def toggle_theme(self): # REMOVED
     #     if self.current_theme == "light":
@@ -0,0 +1,57 @@
+import os
+import re
+import subprocess
+import sys
+
+# Cumulative import time budget for the launch path (app.main and everything it pulls in)
+DEFAULT_STARTUP_BUDGET_MS = 400
+
+# "import time:       self [us] |   cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$")
+
+
+def measure_import_time(module="app.main"):
+    """
+    Import `module` in a fresh interpreter with `-X importtime` and return
+    (total_ms, entries), where entries is a list of (cumulative_ms, self_ms, name)
+    for the top-level imports, slowest first.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        # importtime indents nested imports by two spaces per level; keep the top level only
+        if len(indent) <= 1:
+            entries.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.strip()))
+
+    total_ms = sum(cumulative_ms for cumulative_ms, _, _ in entries)
+    entries.sort(reverse=True)
+    return total_ms, entries
+
+
+def print_startup_report(module="app.main", budget_ms=DEFAULT_STARTUP_BUDGET_MS, top=15):
+    """Print the slowest imports of the launch path; returns False if over budget."""
+    total_ms, entries = measure_import_time(module)
+
+    print(f"Startup import time for '{module}':")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative_ms, self_ms, name in entries[:top]:
+        print(f"{cumulative_ms:>10.1f}ms {self_ms:>8.1f}ms  {name}")
+    print(f"Total: {total_ms:.1f} ms (budget: {budget_ms} ms)")
+
+    within_budget = total_ms <= budget_ms
+    if not within_budget:
+        print(f"Startup import time is over budget by {total_ms - budget_ms:.1f} ms.", file=sys.stderr)
+    return within_budget
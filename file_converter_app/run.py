@@ -1,30 +1,41 @@
 import os
 import sys
-import subprocess
 import importlib.util
 
 def check_requirements():
-    """Check if all requirements are installed"""
-    try:
-        # Try to import PySide6 as a test
-        import PySide6
-        return True
-    except ImportError:
-        return False
-
-def install_requirements():
-    """Install requirements from requirements.txt"""
-    print("Installing requirements...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+    """Check if all requirements are installed, without importing them"""
+    # find_spec only locates the package; importing PySide6 here would pay its
+    # import cost twice on the launch path.
+    return importlib.util.find_spec("PySide6") is not None
+
+def parse_startup_options(argv):
+    """Parse launcher-only options, leaving anything else (e.g. Qt arguments) in argv"""
+    import argparse
+    from app.utils.startup import DEFAULT_STARTUP_BUDGET_MS
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Print an -X importtime style report of the launch path and exit")
+    parser.add_argument("--startup-budget-ms", type=float, default=DEFAULT_STARTUP_BUDGET_MS,
+                        help="Fail the startup report if imports take longer than this")
+    options, remaining = parser.parse_known_args(argv[1:])
+    return options, argv[:1] + remaining
 
 def main():
-    # Check if requirements are installed
+    # Make 'app' importable regardless of the current working directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    if len(sys.argv) > 1:
+        options, sys.argv[:] = parse_startup_options(sys.argv)
+        if options.startup_report:
+            from app.utils.startup import print_startup_report
+            sys.exit(0 if print_startup_report(budget_ms=options.startup_budget_ms) else 1)
+
     if not check_requirements():
-        print("First time setup: Installing requirements...")
-        install_requirements()
-        print("Requirements installed successfully!")
+        print("PySide6 is not installed. Install the requirements first:", file=sys.stderr)
+        print("    pip install -r requirements.txt", file=sys.stderr)
+        sys.exit(1)
 
-    # Run the main application
     print("Starting the application...")
     from app.main import main as app_main
     app_main()
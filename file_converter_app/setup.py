@@ -5,6 +5,6 @@ setup(
     version="0.1",
     packages=find_packages(),
     install_requires=[
-        "PySide6",
+        "PySide6!=6.12.0",
     ],
 ) 
\ No newline at end of file
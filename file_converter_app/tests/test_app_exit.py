@@ -0,0 +1,63 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+HAS_PYSIDE = importlib.util.find_spec("PySide6") is not None
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs the real app.main() event loop offscreen, adds files of the same size (so
+# duplicate detection hashes them in the background) and quits once the hashes
+# have been applied. A crash at interpreter exit only shows in the exit code,
+# so this runs in its own process.
+SMOKE_SCRIPT = textwrap.dedent("""
+    import sys
+    from PySide6 import QtCore, QtWidgets
+    import app.main
+    from app.ui.main_window import MainWindow
+
+    paths = sys.argv[1:]
+    create_window = MainWindow.__init__
+
+    def add_files_then_quit(window, *args, **kwargs):
+        create_window(window, *args, **kwargs)
+        file_handler = window.file_handler
+
+        def quit_when_marked():
+            if any('[duplicate of' in file_handler.file_list_widget.item(row).text()
+                   for row in range(file_handler.file_list_widget.count())):
+                QtWidgets.QApplication.quit()
+            else:
+                QtCore.QTimer.singleShot(20, quit_when_marked)
+
+        QtCore.QTimer.singleShot(0, lambda: file_handler.process_selected_files(paths))
+        QtCore.QTimer.singleShot(0, quit_when_marked)
+        QtCore.QTimer.singleShot(10000, lambda: QtWidgets.QApplication.exit(2)) # Never marked
+
+    MainWindow.__init__ = add_files_then_quit
+    app.main.main()
+""")
+
+
+@unittest.skipUnless(HAS_PYSIDE, "PySide6 is not installed")
+class AppExitSmokeTests(unittest.TestCase):
+    def test_exits_cleanly_after_hashing_same_size_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # A batch like 60 scans of the same dimensions: every file is hashed, some are copies
+            paths = []
+            for index in range(60):
+                paths.append(os.path.join(temp_dir, f"scan_{index}.bmp"))
+                with open(paths[-1], "wb") as input_file:
+                    input_file.write(bytes([index % 40]) * 4096)
+
+            environment = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+            result = subprocess.run([sys.executable, "-c", SMOKE_SCRIPT] + paths, cwd=APP_ROOT, env=environment,
+                                    capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from app.logic.dedupe import NEW, SAME_PATH, DuplicateIndex, content_hash, resolve_path
+
+
+class DuplicateIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def make_file(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as output_file:
+            output_file.write(data)
+        return path
+
+    def add_and_hash(self, index, path):
+        # What the UI does with a worker thread, done inline
+        status, _, paths_to_hash = index.add(path)
+        index.set_hashes({other: content_hash(other) for other in paths_to_hash})
+        return status, index.original_of(path)
+
+    def test_only_same_size_files_are_hashed(self):
+        index = DuplicateIndex()
+        first = resolve_path(self.make_file("a.png", b"aaaa"))
+        self.assertEqual(index.add(first), (NEW, first, []))
+        self.assertEqual(index.add(self.make_file("b.png", b"bbbbbbbb"))[2], [])
+        status, same_size, paths_to_hash = index.add(self.make_file("c.png", b"cccc"))
+        self.assertEqual((status, paths_to_hash), (NEW, [first, same_size]))
+
+    def test_same_path_and_content_copies(self):
+        index = DuplicateIndex()
+        original = self.make_file("a.png", b"same bytes")
+        self.assertEqual(self.add_and_hash(index, original), (NEW, None))
+        self.assertEqual(index.add(os.path.join(self.temp_dir.name, ".", "a.png"))[0], SAME_PATH)
+        self.assertEqual(self.add_and_hash(index, self.make_file("b.png", b"other byte")), (NEW, None))
+        self.assertEqual(self.add_and_hash(index, self.make_file("c.png", b"same bytes")), (NEW, resolve_path(original)))
+
+    def test_hashes_for_removed_files_are_ignored(self):
+        index = DuplicateIndex()
+        first = self.make_file("a.png", b"same bytes")
+        index.add(first)
+        _, copy, paths_to_hash = index.add(self.make_file("b.png", b"same bytes"))
+        hashes = {other: content_hash(other) for other in paths_to_hash}
+        index.remove(first) # Removed while the hashes were being computed
+        index.set_hashes(hashes)
+        self.assertIsNone(index.original_of(copy))
+
+
+if __name__ == "__main__":
+    unittest.main()
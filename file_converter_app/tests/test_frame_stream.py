@@ -0,0 +1,93 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+if HAS_PILLOW:
+    from PIL import Image
+    from app.logic import conversions
+
+
+@unittest.skipUnless(HAS_PILLOW, "Pillow is not installed")
+class MultiFrameConversionTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_animated_gif_to_webp_keeps_frames_and_durations(self):
+        frames = [Image.new('RGB', (32, 32), (index * 20, 0, 0)) for index in range(5)]
+        frames[0].save(self.path('in.gif'), save_all=True, append_images=frames[1:], duration=[40, 50, 60, 70, 80])
+
+        conversions.convert_file(self.path('in.gif'), self.path('out.webp'), 'WebP')
+
+        with Image.open(self.path('out.webp')) as result:
+            durations = []
+            for index in range(result.n_frames):
+                result.seek(index)
+                result.load()
+                durations.append(result.info['duration'])
+        self.assertEqual(durations, [40, 50, 60, 70, 80])
+
+    def test_loop_count_is_preserved(self):
+        frames = [Image.new('RGB', (16, 16), (index * 60, 0, 0)) for index in range(3)]
+        frames[0].save(self.path('once.gif'), save_all=True, append_images=frames[1:], duration=50)
+        frames[0].save(self.path('forever.gif'), save_all=True, append_images=frames[1:], duration=50, loop=0)
+        frames[0].save(self.path('twice.gif'), save_all=True, append_images=frames[1:], duration=50, loop=2)
+
+        expected = {'once': (None, 1), 'forever': (0, 0), 'twice': (2, 2)} # (GIF loop, WebP loop)
+        for name, (gif_loop, webp_loop) in expected.items():
+            with self.subTest(source=name):
+                conversions.convert_file(self.path(f'{name}.gif'), self.path('out.gif'), 'GIF')
+                conversions.convert_file(self.path(f'{name}.gif'), self.path('out.webp'), 'WebP')
+                with Image.open(self.path('out.gif')) as result:
+                    self.assertEqual(result.info.get('loop'), gif_loop)
+                with Image.open(self.path('out.webp')) as result:
+                    self.assertEqual(result.info.get('loop'), webp_loop)
+
+    def test_multi_page_tiff_to_pdf_keeps_pages(self):
+        pages = [Image.new('RGBA', (20, 30), (0, 0, index * 40, 128)) for index in range(4)]
+        pages[0].save(self.path('in.tif'), save_all=True, append_images=pages[1:])
+
+        progress = []
+        conversions.convert_file(self.path('in.tif'), self.path('out.pdf'), 'PDF', progress.append)
+
+        with open(self.path('out.pdf'), 'rb') as result:
+            self.assertEqual(result.read().count(b'/Type /Page\n'), 4)
+        self.assertEqual(progress[-1], 100)
+        self.assertEqual(progress, sorted(progress)) # Never goes backwards
+
+    def test_group4_tiff_to_tiff_stays_bilevel(self):
+        # The source's group4 compression must not be applied to converted (non-bilevel) frames
+        bilevel = Image.new('1', (64, 64))
+        bilevel.save(self.path('single.tif'), compression='group4')
+        bilevel.save(self.path('multi.tif'), compression='group4', save_all=True,
+                     append_images=[Image.new('1', (64, 64), 1)])
+
+        for name in ('single.tif', 'multi.tif'):
+            conversions.convert_file(self.path(name), self.path('out.tiff'), 'TIFF')
+            with Image.open(self.path('out.tiff')) as result:
+                self.assertEqual(result.mode, '1')
+
+    def test_compressed_tiff_converts_to_tiff_with_other_modes(self):
+        Image.new('RGB', (16, 16)).save(self.path('in.tif'), compression='jpeg')
+        Image.new('RGBA', (16, 16)).save(self.path('mixed.tif'), compression='tiff_lzw', save_all=True,
+                                         append_images=[Image.new('1', (16, 16), 1), Image.new('L', (16, 16))])
+
+        conversions.convert_file(self.path('in.tif'), self.path('out.tiff'), 'TIFF')
+        conversions.convert_file(self.path('mixed.tif'), self.path('mixed_out.tiff'), 'TIFF')
+
+        with Image.open(self.path('mixed_out.tiff')) as result:
+            modes = []
+            for index in range(result.n_frames):
+                result.seek(index)
+                modes.append(result.mode)
+        self.assertEqual(modes, ['RGBA', '1', 'L'])
+
+
+if __name__ == '__main__':
+    unittest.main()
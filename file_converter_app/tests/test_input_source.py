@@ -0,0 +1,46 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from app.logic.input_source import InputSource
+
+PNG_DATA = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 8192
+
+
+class InputSourceTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "in.png")
+        with open(self.path, "wb") as input_file:
+            input_file.write(PNG_DATA)
+
+    def test_buffered_and_mapped_reads_agree(self):
+        for mapped in (False, True):
+            with self.subTest(mapped=mapped), InputSource(self.path, mapped=mapped) as source:
+                self.assertEqual(source.sniff_type(), "png")
+                self.assertEqual(source.content_hash(), hashlib.sha256(PNG_DATA).hexdigest())
+                self.assertEqual(source.stream().read(), PNG_DATA) # Rewound after sniffing and hashing
+
+    def test_truncated_input_reads_short_instead_of_faulting(self):
+        # Buffered by default: a file shrinking under the reader must not SIGBUS the process
+        with InputSource(self.path) as source:
+            self.assertEqual(source.sniff_type(), "png")
+            with open(self.path, "r+b") as input_file:
+                input_file.truncate(100)
+            data = source.stream().read()
+        # Whatever was already buffered may still come back, but the read ends early
+        self.assertTrue(PNG_DATA.startswith(data))
+        self.assertLess(len(data), len(PNG_DATA))
+
+    def test_empty_file(self):
+        open(self.path, "wb").close()
+        for mapped in (False, True):
+            with self.subTest(mapped=mapped), InputSource(self.path, mapped=mapped) as source:
+                self.assertIsNone(source.sniff_type())
+                self.assertEqual(source.content_hash(), hashlib.sha256(b"").hexdigest())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+import http.client
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from app.logic.input_source import InputSource
+from app.service.jobs import FINISHED_STATES, JobManager
+from app.service.server import ConversionHTTPServer, UnixConversionHTTPServer
+
+TOKEN = "test-token"
+
+
+class ConversionServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        os.makedirs(self.path("out"))
+
+        # Conversions block until the test lets them finish, so jobs can be held queued/running
+        self.finish_conversions = threading.Event()
+        convert_patch = mock.patch("app.service.jobs.conversions.convert_file", side_effect=self.fake_convert)
+        convert_patch.start()
+        self.addCleanup(convert_patch.stop)
+
+        # One worker and one pending job: two slots in total
+        self.manager = JobManager(workers=1, max_pending=1, work_dir=self.path("work"),
+                                  output_dirs=[self.path("out")])
+        self.addCleanup(self.manager.shutdown)
+        self.server = ConversionHTTPServer(("127.0.0.1", 0), self.manager, TOKEN)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(self.finish_conversions.set) # Cleanups run in reverse: unblock workers first
+
+    def fake_convert(self, input_path, output_path, output_format, progress=None, source=None):
+        self.finish_conversions.wait(timeout=10)
+        shutil.copyfile(input_path, output_path)
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def make_input(self, name, data=b"GIF89a fake image"):
+        with open(self.path(name), "wb") as input_file:
+            input_file.write(data)
+        return self.path(name)
+
+    def free_slots(self):
+        return self.manager._slots._value
+
+    def connect(self):
+        connection = http.client.HTTPConnection(*self.server.server_address, timeout=10)
+        self.addCleanup(connection.close)
+        return connection
+
+    def request(self, method, url, body=None, headers=None, token=TOKEN):
+        headers = dict(headers or {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        connection = self.connect()
+        connection.request(method, url, body=body, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+        return response, data
+
+    def post_json(self, payload, **kwargs):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        response, data = self.request("POST", "/jobs", body, {"Content-Type": "application/json"}, **kwargs)
+        return response.status, json.loads(data)
+
+    def wait_until_finished(self, job_id):
+        job = self.manager.get(job_id)
+        while True:
+            version = job.version
+            if job.status in FINISHED_STATES:
+                return job
+            job.wait_for_change(version, timeout=5)
+
+    def test_full_queue_returns_503(self):
+        for name in ("a.gif", "b.gif"):
+            status, _ = self.post_json({"path": self.make_input(name), "target": "png"})
+            self.assertEqual(status, 202)
+        self.assertEqual(self.free_slots(), 0)
+
+        response, _ = self.request("POST", "/jobs", json.dumps({"path": self.make_input("c.gif"), "target": "png"}),
+                                   {"Content-Type": "application/json"})
+        self.assertEqual(response.status, 503)
+        self.assertEqual(response.getheader("Retry-After"), "5")
+
+        response, _ = self.request("POST", "/jobs/upload?target=png&filename=d.gif", b"GIF89a upload")
+        self.assertEqual(response.status, 503)
+        self.assertEqual(self.free_slots(), 0)
+
+    def test_rejected_requests_do_not_leak_slots(self):
+        valid_input = self.make_input("in.gif")
+        bad_payloads = [
+            {"path": valid_input, "target": None},
+            {"path": valid_input, "target": 5},
+            {"path": valid_input, "target": "exe"},
+            {"path": valid_input, "target": "png", "output_path": 5},
+            {"path": 5, "target": "png"},
+            {"path": self.make_input("in.txt"), "target": "png"},
+            {"path": self.path("missing.gif"), "target": "png"},
+            {"target": "png"},
+            ["not", "an", "object"],
+            b"{not json",
+        ]
+        for payload in bad_payloads:
+            with self.subTest(payload=payload):
+                status, _ = self.post_json(payload)
+                self.assertEqual(status, 400)
+                self.assertEqual(self.free_slots(), 2)
+
+        # Errors raised after the slot is reserved must still release it
+        with mock.patch.object(self.manager, "_flight_key", side_effect=RuntimeError("boom")):
+            status, _ = self.post_json({"path": valid_input, "target": "png"})
+        self.assertEqual(status, 400)
+        self.assertEqual(self.free_slots(), 2)
+
+        response, _ = self.request("POST", "/jobs/upload?target=png&filename=in.exe", b"MZ")
+        self.assertEqual(response.status, 400)
+        response, _ = self.request("POST", "/jobs/upload?target=exe&filename=in.gif", b"GIF89a")
+        self.assertEqual(response.status, 400)
+        self.assertEqual(self.free_slots(), 2)
+        self.assertEqual(os.listdir(self.path("work")), [])
+
+    def test_json_jobs_need_json_content_type_and_small_body(self):
+        body = json.dumps({"path": self.make_input("in.gif"), "target": "png"})
+        response, _ = self.request("POST", "/jobs", body, {"Content-Type": "text/plain"})
+        self.assertEqual(response.status, 415)
+
+        # The oversized body is refused from its Content-Length alone, before it is sent
+        connection = self.connect()
+        connection.putrequest("POST", "/jobs")
+        connection.putheader("Authorization", f"Bearer {TOKEN}")
+        connection.putheader("Content-Type", "application/json")
+        connection.putheader("Content-Length", str(10 * 1024 * 1024))
+        connection.endheaders()
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 413)
+        self.assertEqual(self.free_slots(), 2)
+
+    def test_requests_without_valid_token_are_rejected(self):
+        payload = {"path": self.make_input("in.gif"), "target": "png"}
+        for token in (None, "wrong-token"):
+            with self.subTest(token=token):
+                status, _ = self.post_json(payload, token=token)
+                self.assertEqual(status, 401)
+        response, _ = self.request("GET", "/jobs/unknown", token=None)
+        self.assertEqual(response.status, 401)
+        self.assertEqual(self.free_slots(), 2)
+
+    def test_output_path_is_confined_to_output_dirs(self):
+        input_path = self.make_input("in.gif")
+        for output_path in (self.path("elsewhere.png"), self.path("out/../elsewhere.png"), "/tmp/x/../../etc/out.png"):
+            with self.subTest(output_path=output_path):
+                status, _ = self.post_json({"path": input_path, "target": "png", "output_path": output_path})
+                self.assertEqual(status, 400)
+
+        status, job = self.post_json({"path": input_path, "target": "png", "output_path": self.path("out/in.png")})
+        self.assertEqual(status, 202)
+        self.finish_conversions.set()
+        self.assertEqual(self.wait_until_finished(job["id"]).status, "done")
+        self.assertTrue(os.path.exists(self.path("out/in.png")))
+
+    def test_chunked_upload(self):
+        chunks = [b"GIF89a", b"x" * 70000, b"end"]
+        connection = self.connect()
+        connection.request("POST", "/jobs/upload?target=png&filename=in.gif", body=iter(chunks),
+                           headers={"Authorization": f"Bearer {TOKEN}"}, encode_chunked=True)
+        response = connection.getresponse()
+        job = json.loads(response.read())
+        self.assertEqual(response.status, 202)
+
+        self.finish_conversions.set()
+        self.assertEqual(self.wait_until_finished(job["id"]).status, "done")
+        response, data = self.request("GET", f"/jobs/{job['id']}/result")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(data, b"".join(chunks))
+
+    def test_identical_submissions_share_one_job(self):
+        input_path = self.make_input("in.gif")
+        _, first = self.post_json({"path": input_path, "target": "png"})
+        _, second = self.post_json({"path": input_path, "target": "PNG"})
+        self.assertEqual(first["id"], second["id"])
+        self.assertEqual(second["requesters"], 2)
+
+        self.assertEqual(self.free_slots(), 1) # Only the job holds a slot, not the joiner
+        self.finish_conversions.set()
+        self.wait_until_finished(first["id"])
+
+        # Uploads of the same bytes share a job too (each still needs a slot to send its body)
+        _, data = self.request("POST", "/jobs/upload?target=png&filename=a.gif", b"GIF89a same bytes")
+        upload = json.loads(data)
+        _, data = self.request("POST", "/jobs/upload?target=png&filename=b.gif", b"GIF89a same bytes")
+        self.assertEqual(json.loads(data)["id"], upload["id"])
+        self.wait_until_finished(upload["id"])
+        self.assertEqual(len(os.listdir(self.path("work"))), 2) # Two results, the joiner's upload was dropped
+        self.assertEqual(self.free_slots(), 2)
+
+    def test_delete_only_releases_the_callers_claim(self):
+        input_path = self.make_input("in.gif")
+        _, first = self.post_json({"path": input_path, "target": "png"})
+        _, second = self.post_json({"path": input_path, "target": "png"})
+        self.assertNotEqual(first["claim"], second["claim"])
+        self.finish_conversions.set()
+        self.wait_until_finished(first["id"])
+
+        response, _ = self.request("DELETE", f"/jobs/{first['id']}?claim={first['claim']}")
+        self.assertEqual(response.status, 200)
+        # Repeating the delete, or deleting without a claim, can't take the result from the other requester
+        for url in (f"/jobs/{first['id']}?claim={first['claim']}", f"/jobs/{first['id']}"):
+            with self.subTest(url=url):
+                response, _ = self.request("DELETE", url)
+                self.assertEqual(response.status, 403)
+        response, _ = self.request("GET", f"/jobs/{first['id']}/result")
+        self.assertEqual(response.status, 200)
+
+        response, _ = self.request("DELETE", f"/jobs/{first['id']}?claim={second['claim']}")
+        self.assertEqual(response.status, 200)
+        response, _ = self.request("GET", f"/jobs/{first['id']}")
+        self.assertEqual(response.status, 404)
+        self.assertEqual(os.listdir(self.path("work")), [])
+
+    def test_dedupe_content_opens_each_input_once(self):
+        self.manager.dedupe_content = True
+        with mock.patch("app.service.jobs.InputSource", wraps=InputSource) as input_source:
+            _, first = self.post_json({"path": self.make_input("a.gif"), "target": "png"})
+            _, second = self.post_json({"path": self.make_input("b.gif"), "target": "png"})
+            self.assertEqual(first["id"], second["id"]) # Copies share a job by content
+            self.finish_conversions.set()
+            self.assertEqual(self.wait_until_finished(first["id"]).status, "done")
+        # One open per submission for hashing; the worker reuses the first one instead of reopening
+        self.assertEqual(input_source.call_count, 2)
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are not available")
+class UnixSocketServerTests(unittest.TestCase):
+    def test_refuses_to_replace_a_path_that_is_not_a_socket(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            socket_path = os.path.join(temp_dir, "service.sock")
+            with open(socket_path, "w") as existing_file:
+                existing_file.write("keep me")
+            manager = JobManager(workers=1, max_pending=0, work_dir=os.path.join(temp_dir, "work"))
+            try:
+                with self.assertRaises(FileExistsError):
+                    UnixConversionHTTPServer(socket_path, manager)
+            finally:
+                manager.shutdown()
+            with open(socket_path) as existing_file:
+                self.assertEqual(existing_file.read(), "keep me")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import importlib.util
+import os
+import tempfile
+import time
+import unittest
+
+HAS_PYSIDE = importlib.util.find_spec("PySide6") is not None
+
+if HAS_PYSIDE:
+    from PySide6 import QtGui
+    from app.logic.thumbnailer import ThumbnailLoader, file_signature, prune_disk_cache
+
+
+@unittest.skipUnless(HAS_PYSIDE, "PySide6 is not installed")
+class ThumbnailCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def path(self, *names):
+        return os.path.join(self.temp_dir.name, *names)
+
+    def make_file(self, path, size, age_seconds=0):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as output_file:
+            output_file.write(b"x" * size)
+        timestamp = time.time() - age_seconds
+        os.utime(path, (timestamp, timestamp))
+        return path
+
+    def test_file_signature_follows_edits(self):
+        path = self.make_file(self.path("in.png"), 10, age_seconds=60)
+        signature = file_signature(path)
+        self.assertEqual(signature, (os.path.abspath(path), os.stat(path).st_mtime_ns, 10))
+
+        self.make_file(path, 10) # Same size, newer mtime
+        self.assertNotEqual(file_signature(path), signature)
+        self.assertIsNone(file_signature(self.path("missing.png")))
+
+    def test_prune_drops_old_entries_then_least_recently_used(self):
+        cache_dir = self.path("cache")
+        expired = self.make_file(os.path.join(cache_dir, "aa", "expired.png"), 100, age_seconds=3600)
+        oldest = self.make_file(os.path.join(cache_dir, "bb", "oldest.png"), 100, age_seconds=300)
+        older = self.make_file(os.path.join(cache_dir, "bb", "older.png"), 100, age_seconds=200)
+        newest = self.make_file(os.path.join(cache_dir, "cc", "newest.png"), 100, age_seconds=100)
+
+        prune_disk_cache(cache_dir, max_bytes=250, max_age_seconds=1800)
+
+        remaining = [path for path in (expired, oldest, older, newest) if os.path.exists(path)]
+        self.assertEqual(remaining, [older, newest])
+
+    def test_prune_missing_cache_dir_is_a_no_op(self):
+        prune_disk_cache(self.path("never_created"))
+
+    @staticmethod
+    def finish_render(loader, signature, image, rendered_signature=None):
+        # What a _ThumbnailTask reports back, without running one
+        loader._in_flight[signature[0]] = (None, signature)
+        loader._handle_task_finished(signature[0], image, rendered_signature or signature)
+
+    def test_memory_cache_evicts_least_recently_used(self):
+        loader = ThumbnailLoader(memory_limit=2, disk_cache_dir=self.path("cache"))
+        self.addCleanup(loader.shutdown)
+        first, second, third = [(self.path(f"{index}.png"), index, 10) for index in range(3)]
+        image = QtGui.QImage(4, 4, QtGui.QImage.Format.Format_ARGB32)
+
+        self.finish_render(loader, first, image)
+        self.finish_render(loader, second, image)
+        self.assertIsNotNone(loader.cached(first)) # Now the most recently used
+        self.finish_render(loader, third, image)
+
+        self.assertIsNotNone(loader.cached(first))
+        self.assertIsNone(loader.cached(second))
+        self.assertIsNotNone(loader.cached(third))
+
+    def test_failed_signatures_are_not_requested_again(self):
+        loader = ThumbnailLoader(disk_cache_dir=self.path("cache"))
+        self.addCleanup(loader.shutdown)
+        signature = (self.path("broken.png"), 1, 10)
+        edited = (self.path("broken.png"), 2, 10) # What the task saw when it rendered
+
+        self.finish_render(loader, signature, QtGui.QImage(), rendered_signature=edited)
+
+        loader.request([(signature[0], signature), (edited[0], edited)])
+        self.assertEqual(loader._in_flight, {})
+        self.assertIsNone(loader.cached(None))
+
+
+if __name__ == "__main__":
+    unittest.main()